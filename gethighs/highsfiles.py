@@ -1,4 +1,5 @@
 import os
+import tempfile
 from typing import Any
 
 
@@ -6,51 +7,55 @@ from typing import Any
 # Implementation
 # ----------------------------------------------------------------------------------
 
+BUFFER_SIZE = 1 << 20
+
 
 class HiGHSBaseFile:
 
-    tmp = "./tmp"
-    filename = tmp + ""
+    tmpdir = None
+    filename = ""
     temporary = True
 
+    @property
+    def tmp(self):
+        """Temporary folder to store files. Files of the same ``HiGHS`` instance share its ``tmpdir``,
+        otherwise one is created on first use and removed when no longer referenced
+        """
+        if self.tmpdir is None:
+            self.tmpdir = tempfile.TemporaryDirectory(prefix="gethighs_")
+        return self.tmpdir.name
+
     def __call__(self, *args: Any, **kwds: Any) -> Any:
         return self.filename
 
     def __repr__(self) -> str:
         return self.filename
 
-    def open_tmp_folder(self):
-        """Make sure that there exists a ./tmp folder to store files
-        """
-        exists = os.path.exists(self.tmp)
-        if not exists:
-            os.mkdir(self.tmp)
-
-    def delete_tmp_folder(self):
-        """Delete ./tmp folder if empty
-        """
-        if not os.listdir(self.tmp):
-            os.removedirs(self.tmp)
-
     def delete_file(self):
         if self.temporary:
             os.remove(self.filename)
-            self.delete_tmp_folder()
 
 
 class HiGHSOptions(dict, HiGHSBaseFile):
 
-    filename = HiGHSBaseFile.tmp + "/options.txt"
+    def __init__(self, tmpdir=None, **options):
+        super().__init__(**options)
+        if tmpdir is not None:
+            self.tmpdir = tmpdir
+        self.filename = self.tmp + "/options.txt"
+        self._written = None
 
     def set_options(self, **options):
         self.parse_options(**options)
-        self.open_tmp_folder()
-        with open(self.filename, "w") as file:
-            for key, value in self.items():
-                file.write(f"{key} = {value}\n")
+        content = "".join(f"{key} = {value}\n" for key, value in self.items())
+        # Only this instance writes to its temporary folder, so the last content written is enough
+        if content != self._written or not os.path.exists(self.filename):
+            with open(self.filename, "w", buffering=BUFFER_SIZE) as file:
+                file.write(content)
+            self._written = content
 
     def reset_options(self, **options):
-        self.__init__(**options)
+        self.__init__(tmpdir=self.tmpdir, **options)
         self.set_options(**options)
 
     def parse_options(self, **options):
@@ -60,7 +65,10 @@ class HiGHSOptions(dict, HiGHSBaseFile):
 
 class HiGHSMainFile(HiGHSBaseFile):
 
-    def __init__(self, file=None, suffix=None, **kwargs) -> None:
+    def __init__(self, file=None, suffix=None, tmpdir=None, **kwargs) -> None:
+        if tmpdir is not None:
+            self.tmpdir = tmpdir
+        self.filename = self._parse_from_suffix(suffix="", **kwargs)
         self.parse_file(file=file, suffix=suffix, **kwargs)
 
     def parse_file(self, file=None, suffix=None, **kwargs):
@@ -76,31 +84,28 @@ class HiGHSMainFile(HiGHSBaseFile):
 
 class ModelFileMPS(HiGHSMainFile):
 
-    filename = HiGHSMainFile.tmp + "/model.mps"
-
-    def _parse_from_suffix(self, suffix=None, **kwargs):
+    def _parse_from_suffix(self, suffix=None, compress=False, **kwargs):
+        if compress:
+            return self.tmp + f"/model{suffix}.mps.gz"
         return self.tmp + f"/model{suffix}.mps"
 
 
 class ModelFileLP(HiGHSMainFile):
 
-    filename = HiGHSMainFile.tmp + "/model.lp"
-
     def _parse_from_suffix(self, suffix=None, **kwargs):
         return self.tmp + f"/model{suffix}.lp"
 
 
 class SolFile(HiGHSMainFile):
 
-    filename = HiGHSBaseFile.tmp + "/solution.sol"
-
     def _parse_from_suffix(self, suffix=None, **kwargs):
         return self.tmp + f"/solution{suffix}.sol"
 
 
 class LogFile(HiGHSMainFile):
 
-    filename = "HiGHS.log"
+    def _parse_from_suffix(self, suffix=None, **kwargs):
+        return "HiGHS.log"
 
     def parse_file(self, file=None, suffix=None, **kwargs):
         if file:
@@ -111,13 +116,9 @@ class LogFile(HiGHSMainFile):
 
 class WarmstartFile(HiGHSMainFile):
 
-    filename = HiGHSBaseFile.tmp + "/warmstart.sol"
-
     def _parse_from_suffix(self, suffix=None, **kwargs):
         return self.tmp + f"/warmstart{suffix}.sol"
 
     def delete_file(self):
-        path = self()
-        if os.path.exists(path):
-            os.remove(self.filename)
-            self.delete_tmp_folder()
\ No newline at end of file
+        if os.path.exists(self.filename):
+            os.remove(self.filename)
\ No newline at end of file
@@ -1,10 +1,18 @@
 import os
 import time
+import re
+import gzip
+import mmap
 import math
+import shlex
+import shutil
+import hashlib
+import weakref
+import tempfile
+import signal
 import subprocess
-import numpy as np
-import pyomo.environ as pyo
-from gethighs.highsfiles import HiGHSBaseFile, HiGHSOptions,\
+from concurrent.futures import ThreadPoolExecutor
+from gethighs.highsfiles import BUFFER_SIZE, HiGHSOptions,\
     ModelFileMPS, SolFile, WarmstartFile, LogFile
 
 
@@ -12,13 +20,22 @@ from gethighs.highsfiles import HiGHSBaseFile, HiGHSOptions,\
 # Implementation
 # ----------------------------------------------------------------------------------
 
-SOL_ERROR_MSG = """HiGHS failed when writing the solution file - It is incomplete. Try setting a longer `sleep_time`. Insert a 'try-except' block and re-solve the problem"""
+GZIP_MIN_VERSION = (1, 2, 0)
+
+SOL_COLUMN_PATTERN = re.compile(r"^(\S+) +(\S+)\r?$", re.MULTILINE)
+
+# HiGHS returns its run status: 0 is ok and 1 a warning, e.g. time limit reached with an incumbent
+HIGHS_OK_RETURN_CODES = (0, 1)
+
+HIGHS_ERROR_MSG = """HiGHS exited with code {returncode}. Check the model, options and log file. HiGHS stderr:
+{stderr}"""
+
+SOL_ERROR_MSG = """HiGHS failed when writing the solution file - It is incomplete. Try setting a longer `sleep_time` or `kill_grace`. Insert a 'try-except' block and re-solve the problem"""
 
 
 class HiGHS:
 
     cmd_keys = ("time_limit", "write_model_file", "solution_file")
-    base_file = HiGHSBaseFile()
 
     def __init__(
         self,
@@ -55,17 +72,24 @@ class HiGHS:
         self.solution_file = solution_file
         self.log_file = log_file
 
+        # Temporary files of this instance live here until it is garbage collected
+        self._tmpdir = tempfile.TemporaryDirectory(prefix="gethighs_")
+
         # Other arguments stored in dict
-        self.options = HiGHSOptions(**options)
+        self.options = HiGHSOptions(tmpdir=self._tmpdir, **options)
 
         # Fill future properties
         self.model = None
         self.all_symbols = None
+        self._var_symbols = None
+        self._model_cache = None
+        self._version = None
+        self._version_checked = False
         self.suffix = None
-        self.modelfile = ModelFileMPS()
-        self.solfile = SolFile()
-        self.logfile = LogFile()
-        self.warmstart_file = WarmstartFile()
+        self.modelfile = ModelFileMPS(tmpdir=self._tmpdir)
+        self.solfile = SolFile(tmpdir=self._tmpdir)
+        self.logfile = LogFile(tmpdir=self._tmpdir)
+        self.warmstart_file = WarmstartFile(tmpdir=self._tmpdir)
         self.status = "Unsolved"
         self.primal_solutions = "Unsolved"
         self.objective = "Unsolved"
@@ -82,6 +106,7 @@ class HiGHS:
         """Erase all current HiGHS options and restart. They shall be then stored in a dictonary
         and parsed to the solver when calling ``solve``
         """
+        self._clear_model_cache()
         self.__init__(executable=self.executable, **options)
 
     def parse_options(self, **options):
@@ -120,6 +145,10 @@ class HiGHS:
         rounding_digits=8,
         truncate_precision=8,
         sleep_time=0.1,
+        kill_grace=None,
+        solution_pipe=False,
+        reuse_model_file=False,
+        compress_model=False,
         **options
     ):
         """Solve the current Pyomo optimization model using HiGHS executable
@@ -147,8 +176,8 @@ class HiGHS:
             relative to the current path
 
         removefiles : bool, optional
-            Either or not to remove temporary files after optimization (model, options, and solution),
-            by default True
+            Either or not to remove temporary files after optimization (model and solution), by default True.
+            The options file is kept in the temporary folder of the instance until it is garbage collected
 
         removelog : bool, optional
             Either or not to remove the log file (for now the feature is broken and it should be removed manually),
@@ -164,7 +193,31 @@ class HiGHS:
             Significant digits considered when reading solution (after rounding), by default 8
 
         sleep_time : float | int, optional
-            Time (in seconds) considered to check for a solution and interrupt the process, by default 0.1
+            Longest wait (in seconds) for the solution file to be complete after HiGHS exits, by default 0.1
+
+        kill_grace : float | int | None, optional
+            Time (in seconds) HiGHS may keep running after ``time_limit`` to postsolve and write its
+            solution before it is interrupted. By default None, which relies on HiGHS's own time limit
+            and never interrupts it
+
+        solution_pipe : bool, optional
+            Either or not to read the solution from a named pipe while HiGHS writes it instead of
+            from a file on disk. Only available on POSIX systems and when ``solution_file`` is None,
+            otherwise it is ignored. By default False
+
+        reuse_model_file : bool, optional
+            Either or not to reuse the temporary model file from the previous ``solve`` when it was called
+            with the same model object, still having the same variables, constraints and objectives.
+            Changes in coefficients or bounds are not detected, so only use it when re-solving the same
+            data (warmstart loops, option sweeps). Ignored when ``write_model_file`` is given.
+            By default False
+
+        compress_model : bool, optional
+            Either or not to gzip the temporary model file before passing it to HiGHS, which reduces
+            the bytes HiGHS reads on slow or network filesystems. The model is compressed while Pyomo
+            writes it, so no uncompressed copy is stored. Only used on POSIX systems and with HiGHS 1.2.0
+            or later. The version alone does not prove support: HiGHS must also be built with zlib, so
+            only enable it for executables known to read .gz models. By default False
 
         Returns
         -------
@@ -173,8 +226,6 @@ class HiGHS:
             Model is modified inplace to store new solutions as .value of decision variables.
         """
 
-        self.base_file.open_tmp_folder()
-
         self._parse_cmd_options(
             time_limit=time_limit,
             write_model_file=write_model_file,
@@ -185,45 +236,54 @@ class HiGHS:
         suffix = str(int(time.time_ns()))
         self.suffix = suffix
 
-        self.modelfile.parse_file(file=self.write_model_file, suffix=suffix)
-        modelfile = self.modelfile()
-        self._write_symbol_map(model, modelfile, symbols=symbolic_model)
+        compress = compress_model and self._supports_gzip()
+        self.modelfile.parse_file(file=self.write_model_file, suffix=suffix, compress=compress)
+        if reuse_model_file and self.modelfile.temporary:
+            self._write_cached_symbol_map(model, symbols=symbolic_model, compress=compress)
+        else:
+            self._write_symbol_map(model, self.modelfile.filename, symbols=symbolic_model)
+        modelfile = self.modelfile.filename
 
         self.solfile.parse_file(file=self.solution_file, suffix=suffix)
-        solfile = self.solfile()
+        solfile = self.solfile.filename
 
         self.warmstart_file.parse_file(suffix=suffix)
-        rsf = ""
+        rsf = []
         if warmstart:
-            warmstart_file = self.warmstart_file()
+            warmstart_file = self.warmstart_file.filename
             self._write_warmstartfile(warmstart_file)
-            rsf = f"--read_solution_file {warmstart_file} "
+            rsf = ["--read_solution_file", warmstart_file]
 
         self.logfile.parse_file(file=self.log_file, suffix=None)
-        logfile = self.logfile()
+        logfile = self.logfile.filename
         options["log_file"] = logfile
 
         self.set_options(**options)
-        options_file = self.options()
-
-        time.sleep(sleep_time)
-        cmd_time = self._cmd_timelim
-        cmd_line = \
-            f"{self.executable} {cmd_time} --solution_file {solfile} {rsf}--options_file {options_file} {modelfile}"
-        self.cmd_line = cmd_line
-        process = subprocess.Popen(cmd_line, shell=True)
-        time.sleep(sleep_time)
-        while not os.path.exists(solfile):
-            time.sleep(sleep_time)
-        while not self._check_complete_sol():
-            time.sleep(sleep_time)
-        time.sleep(sleep_time)
-        process.terminate()
-
-        self._read_values_from_sol(
-            rounding_digits=rounding_digits,
-            truncate_precision=truncate_precision,
-        )
+        options_file = self.options.filename
+
+        argv = [self.executable, *self._cmd_timelim, "--solution_file", solfile, *rsf,
+                "--options_file", options_file, modelfile]
+        self.cmd_line = shlex.join(argv)
+
+        if solution_pipe and self.solfile.temporary and hasattr(os, "mkfifo"):
+            self._solve_with_pipe(
+                argv,
+                kill_grace=kill_grace,
+                rounding_digits=rounding_digits,
+                truncate_precision=truncate_precision,
+            )
+        else:
+            process = self._popen(argv)
+            self._wait_process(process, kill_grace)
+
+            # Some network filesystems expose the file slightly after HiGHS exits
+            if not _wait_until(self._check_complete_sol, cap=sleep_time, timeout=sleep_time):
+                raise SystemError(SOL_ERROR_MSG)
+
+            self._read_values_from_sol(
+                rounding_digits=rounding_digits,
+                truncate_precision=truncate_precision,
+            )
 
         if removefiles:
             self._delete_files()
@@ -233,92 +293,403 @@ class HiGHS:
 
         return self.__repr__()
 
+    def _solve_with_pipe(self, argv, kill_grace=None, rounding_digits=8, truncate_precision=8, **kwargs):
+        import numpy as np
+
+        solfile = self.solfile.filename
+        os.mkfifo(solfile)
+
+        # Holding a write end ourselves means neither open blocks and EOF
+        # only arrives once HiGHS has exited, whether or not it wrote anything
+        read_fd = os.open(solfile, os.O_RDONLY | os.O_NONBLOCK)
+        write_fd = os.open(solfile, os.O_WRONLY)
+        os.set_blocking(read_fd, True)
+
+        with os.fdopen(read_fd, "r", buffering=BUFFER_SIZE) as file, ThreadPoolExecutor(max_workers=1) as executor:
+            reader = executor.submit(self._drain_sol, file)
+            try:
+                process = self._popen(argv)
+                self._wait_process(process, kill_grace)
+            finally:
+                os.close(write_fd)
+            header, keys, raw, complete = reader.result()
+
+        if not complete or process.returncode not in HIGHS_OK_RETURN_CODES:
+            raise SystemError(SOL_ERROR_MSG)
+
+        self.status, self.primal_solutions, self.objective = header
+        vals = np.fromiter(raw, dtype=np.float64, count=len(raw))
+        self._set_values(keys, vals, rounding_digits=rounding_digits, truncate_precision=truncate_precision)
+
+    def _drain_sol(self, file):
+        # Keep consuming so HiGHS never blocks on a full pipe if parsing fails
+        try:
+            return self._parse_sol(file)
+        finally:
+            for _ in file:
+                pass
+
+    def _popen(self, argv):
+        return subprocess.Popen(
+            argv, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, errors="replace",
+        )
+
+    def _wait_process(self, process, kill_grace=None):
+        # communicate keeps draining stderr so HiGHS never blocks on it
+        try:
+            _, stderr = process.communicate(timeout=self._wait_timeout(kill_grace))
+        except subprocess.TimeoutExpired:
+            # Interrupted on purpose, the solution checks decide what is usable
+            process.send_signal(signal.SIGTERM)
+            process.communicate()
+            return
+        if process.returncode not in HIGHS_OK_RETURN_CODES:
+            raise SystemError(HIGHS_ERROR_MSG.format(returncode=process.returncode, stderr=stderr.strip()))
+
     def _delete_files(self):
-        self.options.delete_file()
-        self.modelfile.delete_file()
+        # The options file is kept so unchanged options are not rewritten next solve
+        if not self._is_cached_model_file(self.modelfile.filename):
+            self.modelfile.delete_file()
         self.solfile.delete_file()
         self.warmstart_file.delete_file()
 
     @property
     def n_var(self):
-        return sum([1 for obj in self.all_symbols.values() if pyo.is_variable_type(obj)])
+        return len(self._var_symbols)
 
     @property
     def _cmd_timelim(self):
         if self.time_limit:
-            return f" --time_limit {self.time_limit}"
+            return ["--time_limit", str(self.time_limit)]
+        else:
+            return []
+
+    def _wait_timeout(self, kill_grace=None):
+        if self.time_limit and kill_grace is not None:
+            return float(self.time_limit) + kill_grace
         else:
-            return ""
+            return None
 
     def _write_symbol_map(self, model, filename="model.mps", symbols=False):
-        filename, map_id = model.write(filename, io_options={'symbolic_solver_labels': symbols})
-        all_symbols = {}
-        for symbol, obj in model.solutions.symbol_map[map_id].bySymbol.items():
-            all_symbols[symbol] = obj
+        import pyomo.environ as pyo
+
+        if filename.endswith(".gz"):
+            map_id = self._write_compressed_model(model, filename, symbols=symbols)
+        else:
+            filename, map_id = model.write(filename, io_options={'symbolic_solver_labels': symbols})
+        all_symbols = dict(model.solutions.symbol_map[map_id].bySymbol)
         self.all_symbols = all_symbols
+        self._var_symbols = {k: v for k, v in all_symbols.items() if pyo.is_variable_type(v)}
         self.model = model
 
+    def _write_compressed_model(self, model, filename, symbols=False):
+        # Pyomo writes into a named pipe drained by a gzip thread, so the plain
+        # model never reaches the disk
+        plain_file = filename[:-len(".gz")]
+        os.mkfifo(plain_file)
+        try:
+            # As in ``_solve_with_pipe``, our own write end keeps the reader from
+            # seeing EOF before Pyomo opens the pipe, or blocking if it never does
+            read_fd = os.open(plain_file, os.O_RDONLY | os.O_NONBLOCK)
+            write_fd = os.open(plain_file, os.O_WRONLY)
+            os.set_blocking(read_fd, True)
+            with os.fdopen(read_fd, "rb") as source, ThreadPoolExecutor(max_workers=1) as executor:
+                compressing = executor.submit(_gzip_stream, source, filename)
+                try:
+                    _, map_id = model.write(plain_file, io_options={'symbolic_solver_labels': symbols})
+                finally:
+                    os.close(write_fd)
+                compressing.result()
+        except BaseException:
+            if os.path.exists(filename):
+                os.remove(filename)
+            raise
+        finally:
+            os.remove(plain_file)
+        return map_id
+
+    def _supports_gzip(self):
+        return (
+            hasattr(os, "mkfifo")
+            and self.version is not None
+            and self.version >= GZIP_MIN_VERSION
+        )
+
+    @property
+    def version(self):
+        """Version of the HiGHS executable as a tuple of ints, or None if it can not be determined
+        """
+        if not self._version_checked:
+            self._version_checked = True
+            try:
+                result = subprocess.run(
+                    [self.executable, "--version"], capture_output=True, text=True, timeout=10,
+                )
+            except (OSError, subprocess.SubprocessError):
+                return None
+            found = re.search(r"(\d+)\.(\d+)\.(\d+)", result.stdout)
+            if found:
+                self._version = tuple(int(v) for v in found.groups())
+        return self._version
+
+    def _model_signature(self, model, symbols=False, compress=False):
+        import pyomo.environ as pyo
+
+        var_names = sorted(model.component_map(pyo.Var).keys())
+        n_var = sum(1 for _ in model.component_data_objects(pyo.Var))
+        n_con = sum(1 for _ in model.component_data_objects(pyo.Constraint, active=True))
+        n_obj = sum(1 for _ in model.component_data_objects(pyo.Objective, active=True))
+        key = repr((id(model), symbols, compress, var_names, n_var, n_con, n_obj))
+        return hashlib.sha1(key.encode()).hexdigest()
+
+    def _write_cached_symbol_map(self, model, symbols=False, compress=False):
+        # Only the last model is cached. The weak reference guards against a new
+        # model reusing the id of a garbage-collected one
+        signature = self._model_signature(model, symbols=symbols, compress=compress)
+        cached = self._model_cache
+        if (
+            cached is not None
+            and cached[0] == signature
+            and cached[1]() is model
+            and os.path.exists(cached[2])
+        ):
+            _, _, self.modelfile.filename, self.all_symbols, self._var_symbols = cached
+            self.model = model
+        else:
+            self._clear_model_cache()
+            self._write_symbol_map(model, self.modelfile.filename, symbols=symbols)
+            self._model_cache = (
+                signature, weakref.ref(model), self.modelfile.filename, self.all_symbols, self._var_symbols,
+            )
+
+    def _is_cached_model_file(self, filename):
+        return self._model_cache is not None and self._model_cache[2] == filename
+
+    def _clear_model_cache(self):
+        if self._model_cache is not None:
+            filename = self._model_cache[2]
+            if os.path.exists(filename):
+                os.remove(filename)
+        self._model_cache = None
+
     def _check_complete_sol(self):
-        with open(self.solfile(), "r") as file:
-            file_txt = file.read()
-            check = "# Basis\nHiGHS" in file_txt
-            check = check and file_txt.endswith("\n")
-        return check
+        try:
+            file = open(self.solfile.filename, "rb", buffering=0)
+        except FileNotFoundError:
+            return False
+        with file:
+            try:
+                buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                return False
+            with buffer:
+                # rfind only pages in the trailing basis section
+                found = buffer.rfind(b"# Basis")
+                if found < 0 or buffer[-1:] != b"\n":
+                    return False
+                after = buffer[found + len(b"# Basis"):found + len(b"# Basis\r\nHiGHS")]
+                return after.startswith((b"\nHiGHS", b"\r\nHiGHS"))
 
     def _read_values_from_sol(self, rounding_digits=8, truncate_precision=8, **kwargs):
+        with open(self.solfile.filename, "rb") as file:
+            try:
+                buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise SystemError(SOL_ERROR_MSG)
+            with buffer:
+                self._parse_sol_buffer(
+                    buffer, rounding_digits=rounding_digits, truncate_precision=truncate_precision,
+                )
+
+    def _parse_sol_buffer(self, buffer, rounding_digits=8, truncate_precision=8, **kwargs):
+        import numpy as np
+
         status = None
         primal_solutions = None
         objective = None
-        solfile = self.solfile()
-
-        with open(solfile, "r") as file:
-            lines = file.readlines()
-            for j, line in enumerate(lines):
-                while status is None and j <= 10:
-                    if "Model status" in line:
-                        status = lines[j + 1].rstrip("\n")
-                else:
-                    if "# Primal solution values" in line:
-                        primal_solutions = lines[j + 1].rstrip("\n")
-                        objective_line = lines[j + 2].rstrip("\n")
-                        splt = objective_line.split(sep=" ", maxsplit=1)
-                        try:
-                            objective = float(splt[-1])
-                        except (ValueError, TypeError):
-                            pass
-                        continue
-                    else:
-                        splt = line.split(sep=" ", maxsplit=1)
-                        if splt[0] in self.all_symbols.keys():
-                            if pyo.is_variable_type(self.all_symbols[splt[0]]):
-                                if len(splt) > 0:
-                                    value = round(float(splt[1]), rounding_digits)
-                                    self.all_symbols[splt[0]].value = truncate(value, precision=truncate_precision)
-                                else:
-                                    raise SystemError(SOL_ERROR_MSG)
+
+        found = buffer.find(b"Model status")
+        if found >= 0:
+            _, pos = _read_line(buffer, found)
+            status, _ = _read_line(buffer, pos)
+
+        primal = buffer.find(b"# Primal solution values")
+        if primal >= 0:
+            _, pos = _read_line(buffer, primal)
+            primal_solutions, pos = _read_line(buffer, pos)
+            objective_line, pos = _read_line(buffer, pos)
+            splt = objective_line.split(sep=" ", maxsplit=1)
+            try:
+                objective = float(splt[-1])
+            except (ValueError, TypeError):
+                pass
 
         self.status = status
         self.primal_solutions = primal_solutions
         self.objective = objective
 
-    def _write_warmstartfile(self, filename):
-        with open(filename, "w") as file:
-            file.write("Model status\n")
-            file.write(f"Unknown\n\n")
-            file.write("# Primal solution values\n")
-            file.write(f"Unknown\n")
-            file.write(f"Objective Unknown\n")
-            N = self.n_var
-            file.write(f"# Columns {N}\n")
-            for key, obj in self.all_symbols.items():
-                if pyo.is_variable_type(obj):
-                    if obj.value is None:
-                        file.write(f"{key} 0.0\n")
+        if primal < 0 or primal_solutions == "None":
+            return
+
+        # Dual values and basis are listed by the same names, so stay within the primal section
+        primal_end = _find_first(buffer, (b"\n# Dual solution values", b"\n# Basis"), primal)
+        columns = buffer.find(b"# Columns", primal, primal_end)
+        if columns < 0:
+            return
+
+        end = _find_first(buffer, (b"\n# Rows",), columns, primal_end)
+        keys = []
+        raw = []
+        for name, value in SOL_COLUMN_PATTERN.findall(buffer[columns:end].decode()):
+            if name in self._var_symbols:
+                keys.append(name)
+                raw.append(value)
+
+        vals = np.array(raw, dtype=np.float64)
+        self._set_values(keys, vals, rounding_digits=rounding_digits, truncate_precision=truncate_precision)
+
+    def _parse_sol(self, file):
+        """Parse a solution stream without assigning it, so callers can first check it is complete.
+        Returns ``(status, primal_solutions, objective)``, the variable names, their raw values and
+        whether the stream ended after a '# Basis' header and a trailing newline
+        """
+        status = None
+        primal_solutions = None
+        objective = None
+
+        in_primal = False
+        complete = False
+        keys = []
+        raw = []
+
+        last_line = [""]
+        lines = _track_last(file, last_line)
+        for line in lines:
+            if status is None and "Model status" in line:
+                status = next(lines, "").rstrip("\n")
+            elif "# Primal solution values" in line:
+                primal_solutions = next(lines, "").rstrip("\n")
+                in_primal = primal_solutions != "None"
+                if not in_primal:
+                    continue
+                objective_line = next(lines, "").rstrip("\n")
+                splt = objective_line.split(sep=" ", maxsplit=1)
+                try:
+                    objective = float(splt[-1])
+                except (ValueError, TypeError):
+                    pass
+            elif line.rstrip("\n") == "# Basis":
+                in_primal = False
+                complete = next(lines, "").startswith("HiGHS")
+            elif not in_primal:
+                continue
+            elif line.startswith("# ") and not line.startswith(("# Columns", "# Rows")):
+                # Dual values and basis are listed by the same names
+                in_primal = False
+            else:
+                splt = line.split(sep=" ", maxsplit=1)
+                if splt[0] in self._var_symbols:
+                    if len(splt) > 1:
+                        keys.append(splt[0])
+                        raw.append(splt[1])
                     else:
-                        file.write(f"{key} {obj.value}\n")
+                        raise SystemError(SOL_ERROR_MSG)
+
+        complete = complete and last_line[0].endswith("\n")
+        return (status, primal_solutions, objective), keys, raw, complete
 
+    def _set_values(self, keys, vals, rounding_digits=8, truncate_precision=8):
+        import numpy as np
 
-def truncate(x: float, precision=16):
-    base = math.floor(np.log10(abs(x) + 10**(-precision)))
+        vals = truncate_array(np.round(vals, rounding_digits), precision=truncate_precision)
+        for key, value in zip(keys, vals.tolist()):
+            self._var_symbols[key].value = value
+
+    def _write_warmstartfile(self, filename):
+        columns = [
+            f"{key} {obj.value if obj.value is not None else 0.0}\n"
+            for key, obj in self._var_symbols.items()
+        ]
+        lines = [
+            "Model status\n",
+            "Unknown\n\n",
+            "# Primal solution values\n",
+            "Unknown\n",
+            "Objective Unknown\n",
+            f"# Columns {len(columns)}\n",
+        ]
+        lines.extend(columns)
+        payload = memoryview("".join(lines).encode())
+        fd = os.open(filename, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            while payload:
+                payload = payload[os.write(fd, payload):]
+        finally:
+            os.close(fd)
+
+
+def _track_last(lines, last_line):
+    for line in lines:
+        last_line[0] = line
+        yield line
+
+
+def _gzip_stream(source, filename):
+    # Keep consuming so Pyomo never blocks on a full pipe if compressing fails
+    try:
+        with gzip.open(filename, "wb", compresslevel=1) as target:
+            shutil.copyfileobj(source, target, BUFFER_SIZE)
+    finally:
+        while source.read(BUFFER_SIZE):
+            pass
+
+
+def _wait_until(condition, initial=0.001, cap=0.1, timeout=None):
+    delay = initial
+    start = time.monotonic()
+    while not condition():
+        if timeout is not None and time.monotonic() - start >= timeout:
+            return False
+        time.sleep(delay)
+        delay = min(2 * delay, cap)
+    return True
+
+
+def _read_line(buffer, start):
+    end = buffer.find(b"\n", start)
+    if end < 0:
+        end = len(buffer)
+    return buffer[start:end].decode().rstrip("\r"), end + 1
+
+
+def _find_first(buffer, markers, start=0, end=None):
+    if end is None:
+        end = len(buffer)
+    found = [idx for idx in (buffer.find(marker, start, end) for marker in markers) if idx >= 0]
+    return min(found, default=end)
+
+
+def truncate(x: float, precision=16, eps=None):
+    if eps is None:
+        eps = 10**(-precision)
+    base = math.floor(math.log10(abs(x) + eps))
     digits = max(precision - base, 1)
     return round(x, digits)
+
+
+def truncate_array(x, precision=16):
+    """Vectorized ``truncate``. Scaling by powers of ten may differ from ``round`` in the last kept digit
+    """
+    import numpy as np
+
+    x = np.asarray(x, dtype=np.float64)
+    finite = np.isfinite(x)
+    safe = np.where(finite, x, 0.0)
+    base = np.floor(np.log10(np.abs(safe) + 10**(-precision)))
+    digits = np.maximum(precision - base.astype(np.int64), 1)
+    factor = np.power(10.0, digits)
+    with np.errstate(over="ignore", invalid="ignore"):
+        scaled = safe * factor
+    # Magnitudes close to the float limit overflow when scaled, and are integral anyway
+    scalable = finite & np.isfinite(scaled)
+    return np.where(scalable, np.round(np.where(scalable, scaled, 0.0)) / factor, x)